@@ -1,26 +1,59 @@
 """FastAPI wrapper for Stat-Xplore API."""
 
+import asyncio
+import json
+from collections.abc import Callable
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse
 from pydantic import BaseModel
 
-from stat_xplore_mcp.client import StatXploreClient
+from stat_xplore_mcp.backends import QuotaExceededError
+from stat_xplore_mcp.client import StatXploreClient, build_simple_query
+from stat_xplore_mcp.config import settings
+from stat_xplore_mcp.fields import get_field_index
 from stat_xplore_mcp.models import (
+    FieldValuePage,
     RateLimitInfo,
     SchemaItem,
     TableQuery,
     TableQueryResponse,
 )
+from stat_xplore_mcp.planner import planner
+from stat_xplore_mcp.prefetch import prefetch_loop
+from stat_xplore_mcp.responses import CachedResponse, ResponseMemo
+
+# Guidance only changes on deploy; clients revalidate with its ETag after this
+GUIDANCE_MAX_AGE = 3600
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background prefetch of hot queries while the app is up."""
+    task = None
+    if settings.prefetch_interval > 0:
+        task = asyncio.create_task(prefetch_loop())
+    yield
+    if task is not None:
+        task.cancel()
+
 
 app = FastAPI(
     title="Stat-Xplore API",
     description="API wrapper for DWP Stat-Xplore Open Data API",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 
+@app.exception_handler(QuotaExceededError)
+async def quota_exceeded_handler(request: Request, exc: QuotaExceededError):
+    """Report an exhausted shared quota as 429 Too Many Requests."""
+    return JSONResponse(status_code=429, content={"detail": str(exc)})
+
+
 class SimpleTableQuery(BaseModel):
     """Simplified table query request."""
 
@@ -166,6 +199,36 @@ def markdown_to_html(markdown_content: str) -> str:
     """
 
 
+# Rendered and hashed once at startup
+_guidance_content = load_guidance()
+guidance_html = CachedResponse(
+    markdown_to_html(_guidance_content).encode(),
+    "text/html; charset=utf-8",
+    GUIDANCE_MAX_AGE,
+)
+guidance_raw = CachedResponse(
+    json.dumps({"content": _guidance_content}).encode(),
+    "application/json",
+    GUIDANCE_MAX_AGE,
+)
+
+# Catalogue responses, versioned by the ETag of their content
+catalogue_responses = ResponseMemo(settings.schema_cache_ttl)
+# Catalogue payloads are compressed on demand, where brotli's top quality
+# costs seconds on large schemas for little gain
+CATALOGUE_BROTLI_QUALITY = 5
+
+
+def catalogue_response(payload: str) -> CachedResponse:
+    """Wrap a JSON catalogue payload for caching."""
+    return CachedResponse(
+        payload.encode(),
+        "application/json",
+        settings.schema_cache_ttl,
+        brotli_quality=CATALOGUE_BROTLI_QUALITY,
+    )
+
+
 @app.get("/")
 async def root():
     """API root endpoint with quick links."""
@@ -178,6 +241,7 @@ async def root():
             "guidance": "/guidance - Comprehensive usage guide and examples",
             "databases": "/databases - List available databases",
             "schema": "/schema - Browse schema hierarchy",
+            "field_values": "/field/{id}/values - Page and search a field's values",
             "rate_limit": "/rate_limit - Check API quota",
         },
         "quick_start": {
@@ -190,80 +254,128 @@ async def root():
 
 
 @app.get("/guidance", response_class=HTMLResponse)
-async def get_guidance():
+async def get_guidance(request: Request):
     """Get comprehensive API guidance and examples."""
-    guidance_content = load_guidance()
-    return markdown_to_html(guidance_content)
+    return guidance_html.respond(request)
 
 
 @app.get("/guidance/raw")
-async def get_guidance_raw():
+async def get_guidance_raw(request: Request):
     """Get raw markdown guidance content."""
-    return {"content": load_guidance()}
+    return guidance_raw.respond(request)
 
 
 @app.get("/databases", response_model=list[DatabaseListItem])
-async def list_databases():
+def list_databases(request: Request):
     """List all available Stat-Xplore databases."""
-    with get_client() as client:
-        databases = client.list_databases()
-        return [
+
+    def build() -> CachedResponse:
+        with get_client() as client:
+            databases = client.list_databases()
+        items = [
             DatabaseListItem(id=db.id, label=db.label, location=db.location)
             for db in databases
         ]
+        return catalogue_response(json.dumps([item.model_dump() for item in items]))
+
+    return catalogue_responses.get("databases", build).respond(request)
+
+
+def schema_response(
+    key: str, fetch: Callable[[StatXploreClient], SchemaItem]
+) -> CachedResponse:
+    """Get the cached response for a schema item, fetching it if needed."""
+
+    def build() -> CachedResponse:
+        with get_client() as client:
+            return catalogue_response(fetch(client).model_dump_json())
+
+    return catalogue_responses.get(key, build)
 
 
 @app.get("/schema", response_model=SchemaItem)
-async def get_root_schema():
+def get_root_schema(request: Request):
     """Get the root schema."""
-    with get_client() as client:
-        return client.get_schema()
+    return schema_response("schema:", lambda c: c.get_schema()).respond(request)
 
 
 @app.get("/schema/{schema_id:path}", response_model=SchemaItem)
-async def get_schema(schema_id: str):
+def get_schema(schema_id: str, request: Request):
     """Get schema for a specific path."""
-    with get_client() as client:
-        try:
-            return client.get_schema(schema_id)
-        except Exception as e:
-            raise HTTPException(status_code=404, detail=str(e))
+    try:
+        response = schema_response(
+            f"schema:{schema_id}", lambda c: c.get_schema(schema_id)
+        )
+        return response.respond(request)
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 
 @app.get("/database/{database_id:path}", response_model=SchemaItem)
-async def get_database_info(database_id: str):
+def get_database_info(database_id: str, request: Request):
     """Get detailed info about a database."""
+    try:
+        response = schema_response(
+            f"database:{database_id}", lambda c: c.get_database_info(database_id)
+        )
+        return response.respond(request)
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/field/{field_id:path}/values", response_model=FieldValuePage)
+def list_field_values(
+    field_id: str,
+    prefix: str | None = None,
+    search: str | None = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """List a field's value IDs, with paging, code prefix and label search."""
     with get_client() as client:
         try:
-            return client.get_database_info(database_id)
+            index = get_field_index(client, field_id)
+        except QuotaExceededError:
+            raise
         except Exception as e:
             raise HTTPException(status_code=404, detail=str(e))
+    return index.page(prefix=prefix, search=search, offset=offset, limit=limit)
 
 
 @app.post("/table", response_model=TableQueryResponse)
-async def query_table(query: TableQuery):
-    """Execute a table query."""
-    with get_client() as client:
-        try:
-            return client.query_table(query)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=str(e))
+def query_table(query: TableQuery):
+    """Execute a table query.
+
+    Runs in the threadpool so concurrent queries can be merged by the planner.
+    """
+    try:
+        return planner.query_table(query)
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.post("/table/simple", response_model=TableQueryResponse)
-async def query_table_simple(query: SimpleTableQuery):
-    """Execute a simplified table query."""
-    with get_client() as client:
-        try:
-            return client.query_table_simple(
-                database=query.database,
-                measures=query.measures,
-                row_fields=query.row_fields,
-                column_fields=query.column_fields,
-                filters=query.filters,
-            )
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=str(e))
+def query_table_simple(query: SimpleTableQuery):
+    """Execute a simplified table query through the planner."""
+    table_query = build_simple_query(
+        database=query.database,
+        measures=query.measures,
+        row_fields=query.row_fields,
+        column_fields=query.column_fields,
+        filters=query.filters,
+    )
+    try:
+        return planner.query_table(table_query)
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/rate_limit", response_model=RateLimitInfo)
@@ -0,0 +1,464 @@
+"""Shared storage for caches and quota tracking.
+
+Every worker process talks to the same backend, so cached upstream responses
+and the API-key token bucket are shared rather than duplicated per process.
+"""
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from stat_xplore_mcp.config import settings
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when the shared Stat-Xplore quota has no tokens left."""
+
+
+# SQLiteBackend sweeps expired cache rows once every this many writes
+_SWEEP_EVERY = 100
+
+
+class Backend(ABC):
+    """Interface for a shared cache and token-bucket store."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """Return the cached value for ``key``, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+
+    @abstractmethod
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Store ``value`` only if ``key`` is absent. Returns True if stored."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key`` if present."""
+
+    @abstractmethod
+    def incr_score(self, key: str, member: str, amount: float = 1.0) -> None:
+        """Add ``amount`` to the score of ``member`` in the set ``key``."""
+
+    @abstractmethod
+    def top_scores(self, key: str, count: int) -> list[tuple[str, float]]:
+        """Return up to ``count`` members of ``key`` with the highest scores."""
+
+    @abstractmethod
+    def remove_score(self, key: str, member: str) -> None:
+        """Remove ``member`` from the set ``key``."""
+
+    @abstractmethod
+    def scale_scores(self, key: str, factor: float) -> None:
+        """Multiply every score in the set ``key`` by ``factor``."""
+
+    @abstractmethod
+    def trim_scores(self, key: str, keep: int) -> None:
+        """Drop all but the ``keep`` highest-scoring members of ``key``."""
+
+    @abstractmethod
+    def take_token(
+        self, key: str, capacity: int, refill_rate: float, reserve: int = 0
+    ) -> bool:
+        """Atomically take one token from the bucket stored under ``key``.
+
+        Args:
+            key: Bucket identifier.
+            capacity: Maximum number of tokens in the bucket.
+            refill_rate: Tokens added per second.
+            reserve: Tokens that must remain after taking one, so low-priority
+                callers only use spare quota.
+
+        Returns:
+            True if a token was taken, False if not enough tokens are left.
+        """
+
+    @abstractmethod
+    def limit_tokens(
+        self, key: str, capacity: int, refill_rate: float, tokens: float
+    ) -> None:
+        """Lower the bucket under ``key`` to at most ``tokens``.
+
+        Used to follow the quota the upstream API reports as remaining.
+        """
+
+
+def _refill(
+    tokens: float, updated_at: float, now: float, capacity: int, refill_rate: float
+) -> float:
+    return min(capacity, tokens + max(0.0, now - updated_at) * refill_rate)
+
+
+class MemoryBackend(Backend):
+    """In-process backend. Only shared between threads of one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: dict[str, tuple[bytes, float]] = {}
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._scores: dict[str, dict[str, float]] = {}
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._values[key] = (value, time.time() + ttl)
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is not None and entry[1] > time.time():
+                return False
+            self._values[key] = (value, time.time() + ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+
+    def incr_score(self, key: str, member: str, amount: float = 1.0) -> None:
+        with self._lock:
+            scores = self._scores.setdefault(key, {})
+            scores[member] = scores.get(member, 0.0) + amount
+
+    def top_scores(self, key: str, count: int) -> list[tuple[str, float]]:
+        with self._lock:
+            scores = list(self._scores.get(key, {}).items())
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:count]
+
+    def remove_score(self, key: str, member: str) -> None:
+        with self._lock:
+            self._scores.get(key, {}).pop(member, None)
+
+    def scale_scores(self, key: str, factor: float) -> None:
+        with self._lock:
+            scores = self._scores.get(key, {})
+            for member in scores:
+                scores[member] *= factor
+
+    def trim_scores(self, key: str, keep: int) -> None:
+        with self._lock:
+            scores = self._scores.get(key, {})
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            self._scores[key] = dict(ranked[:keep])
+
+    def take_token(
+        self, key: str, capacity: int, refill_rate: float, reserve: int = 0
+    ) -> bool:
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated_at, now, capacity, refill_rate)
+            taken = tokens >= 1 + reserve
+            if taken:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            return taken
+
+    def limit_tokens(
+        self, key: str, capacity: int, refill_rate: float, tokens: float
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            current, updated_at = self._buckets.get(key, (capacity, now))
+            current = _refill(current, updated_at, now, capacity, refill_rate)
+            self._buckets[key] = (min(current, tokens), now)
+
+
+class SQLiteBackend(Backend):
+    """Backend stored in a local SQLite file, shared by processes on one host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        # The cache is private to its user: other users could poison it
+        Path(path).parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores (key TEXT NOT NULL, "
+            "member TEXT NOT NULL, score REAL NOT NULL, PRIMARY KEY (key, member))"
+        )
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _sweep(self) -> None:
+        """Delete expired cache rows every ``_SWEEP_EVERY`` writes."""
+        self._writes += 1
+        if self._writes % _SWEEP_EVERY == 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE expires_at <= ?", (time.time(),)
+            )
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            self._sweep()
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key = ? AND expires_at <= ?", (key, now)
+            )
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl),
+            )
+            added = cursor.rowcount == 1
+            self._sweep()
+        return added
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def incr_score(self, key: str, member: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO scores (key, member, score) VALUES (?, ?, ?) "
+                "ON CONFLICT (key, member) "
+                "DO UPDATE SET score = score + excluded.score",
+                (key, member, amount),
+            )
+
+    def top_scores(self, key: str, count: int) -> list[tuple[str, float]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT member, score FROM scores WHERE key = ? "
+                "ORDER BY score DESC LIMIT ?",
+                (key, count),
+            ).fetchall()
+        return [(member, score) for member, score in rows]
+
+    def remove_score(self, key: str, member: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM scores WHERE key = ? AND member = ?", (key, member)
+            )
+
+    def scale_scores(self, key: str, factor: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE scores SET score = score * ? WHERE key = ?", (factor, key)
+            )
+
+    def trim_scores(self, key: str, keep: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM scores WHERE key = ? AND member NOT IN "
+                "(SELECT member FROM scores WHERE key = ? "
+                "ORDER BY score DESC LIMIT ?)",
+                (key, key, keep),
+            )
+
+    def _update_bucket(
+        self,
+        key: str,
+        capacity: int,
+        refill_rate: float,
+        update: Callable[[float], tuple[float, Any]],
+    ) -> Any:
+        """Apply ``update`` to the refilled token count under ``key``.
+
+        ``update`` returns the new token count and a result to pass back.
+        """
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so the
+            # read-modify-write below is atomic across processes.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated_at = row if row else (capacity, now)
+                tokens = _refill(tokens, updated_at, now, capacity, refill_rate)
+                tokens, result = update(tokens)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, tokens, now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def take_token(
+        self, key: str, capacity: int, refill_rate: float, reserve: int = 0
+    ) -> bool:
+        def take(tokens: float) -> tuple[float, bool]:
+            if tokens >= 1 + reserve:
+                return tokens - 1, True
+            return tokens, False
+
+        return self._update_bucket(key, capacity, refill_rate, take)
+
+    def limit_tokens(
+        self, key: str, capacity: int, refill_rate: float, tokens: float
+    ) -> None:
+        self._update_bucket(
+            key, capacity, refill_rate, lambda current: (min(current, tokens), None)
+        )
+
+
+# Both scripts use the Redis server clock so workers on different hosts agree
+# on refill. ARGV[3] is the reserve for taking, or the new limit for limiting.
+_BUCKET_PREAMBLE = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+"""
+
+_BUCKET_SAVE = """
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+if rate > 0 then
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+end
+"""
+
+_TAKE_TOKEN_SCRIPT = (
+    _BUCKET_PREAMBLE
+    + """
+local taken = 0
+if tokens >= 1 + tonumber(ARGV[3]) then
+    tokens = tokens - 1
+    taken = 1
+end
+"""
+    + _BUCKET_SAVE
+    + "return taken\n"
+)
+
+_SCALE_SCORES_SCRIPT = """
+local rows = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+local factor = tonumber(ARGV[1])
+for i = 1, #rows, 2 do
+    redis.call('ZADD', KEYS[1], tonumber(rows[i + 1]) * factor, rows[i])
+end
+"""
+
+_LIMIT_TOKENS_SCRIPT = (
+    _BUCKET_PREAMBLE + "tokens = math.min(tokens, tonumber(ARGV[3]))\n" + _BUCKET_SAVE
+)
+
+
+class RedisBackend(Backend):
+    """Backend stored in Redis (or any server speaking the Redis protocol).
+
+    Requires the ``redis`` extra. A pre-built client, such as a local stand-in
+    server's client, can be passed instead of a URL.
+    """
+
+    def __init__(self, url: str | None = None, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError(
+                    "RedisBackend requires the 'redis' package. "
+                    "Install it with: pip install 'stat-xplore-mcp[redis]'"
+                ) from e
+            client = redis.Redis.from_url(url or settings.redis_url)
+        self._redis = client
+        self._take_token = self._redis.register_script(_TAKE_TOKEN_SCRIPT)
+        self._limit_tokens = self._redis.register_script(_LIMIT_TOKENS_SCRIPT)
+        self._scale_scores = self._redis.register_script(_SCALE_SCORES_SCRIPT)
+
+    def get(self, key: str) -> bytes | None:
+        return self._redis.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._redis.set(key, value, px=max(1, int(ttl * 1000)))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(self._redis.set(key, value, px=max(1, int(ttl * 1000)), nx=True))
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(key)
+
+    def incr_score(self, key: str, member: str, amount: float = 1.0) -> None:
+        self._redis.zincrby(key, amount, member)
+
+    def top_scores(self, key: str, count: int) -> list[tuple[str, float]]:
+        rows = self._redis.zrevrange(key, 0, count - 1, withscores=True)
+        return [
+            (member.decode() if isinstance(member, bytes) else member, score)
+            for member, score in rows
+        ]
+
+    def remove_score(self, key: str, member: str) -> None:
+        self._redis.zrem(key, member)
+
+    def scale_scores(self, key: str, factor: float) -> None:
+        self._scale_scores(keys=[key], args=[factor])
+
+    def trim_scores(self, key: str, keep: int) -> None:
+        self._redis.zremrangebyrank(key, 0, -(keep + 1))
+
+    def take_token(
+        self, key: str, capacity: int, refill_rate: float, reserve: int = 0
+    ) -> bool:
+        return bool(self._take_token(keys=[key], args=[capacity, refill_rate, reserve]))
+
+    def limit_tokens(
+        self, key: str, capacity: int, refill_rate: float, tokens: float
+    ) -> None:
+        self._limit_tokens(keys=[key], args=[capacity, refill_rate, tokens])
+
+
+@lru_cache
+def get_backend() -> Backend:
+    """Get the process-wide backend selected by ``settings.cache_backend``."""
+    if settings.cache_backend == "memory":
+        return MemoryBackend()
+    if settings.cache_backend == "sqlite":
+        return SQLiteBackend(settings.cache_path)
+    if settings.cache_backend == "redis":
+        return RedisBackend(settings.redis_url)
+    raise ValueError(f"Unknown cache backend: {settings.cache_backend}")
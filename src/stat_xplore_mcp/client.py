@@ -1,8 +1,13 @@
 """Stat-Xplore API client."""
 
+import hashlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+
 import httpx
 from rich.console import Console
 
+from stat_xplore_mcp.backends import Backend, QuotaExceededError, get_backend
 from stat_xplore_mcp.config import settings
 from stat_xplore_mcp.models import (
     RateLimitInfo,
@@ -10,22 +15,105 @@ from stat_xplore_mcp.models import (
     TableQuery,
     TableQueryResponse,
 )
+from stat_xplore_mcp.streaming import parse_table_response
 
 console = Console()
 
 
+def build_simple_query(
+    database: str,
+    measures: list[str],
+    row_fields: list[str],
+    column_fields: list[str] | None = None,
+    filters: dict[str, list[str]] | None = None,
+) -> TableQuery:
+    """Build a table query from rows, optional columns and value filters."""
+    dimensions = [row_fields]
+    if column_fields:
+        dimensions.append(column_fields)
+
+    recodes = None
+    if filters:
+        recodes = {
+            field_id: {"map": [[v] for v in values]}
+            for field_id, values in filters.items()
+        }
+
+    return TableQuery(
+        database=database,
+        measures=measures,
+        dimensions=dimensions,
+        recodes=recodes,
+    )
+
+
 class StatXploreClient:
     """Client for the Stat-Xplore Open Data API."""
 
-    def __init__(self, api_key: str | None = None, base_url: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        backend: Backend | None = None,
+        quota_reserve: int = 0,
+    ):
         self.api_key = api_key or settings.stat_xplore_api_key
         self.base_url = base_url or settings.stat_xplore_base_url
+        self._backend = backend or get_backend()
+        # Requests fail rather than leave fewer than this many quota tokens
+        self.quota_reserve = quota_reserve
+        self._quota_key = (
+            "quota:" + hashlib.sha256(self.api_key.encode()).hexdigest()[:16]
+        )
         self._client = httpx.Client(
             base_url=self.base_url,
             headers={"APIKey": self.api_key},
             timeout=120.0,
         )
 
+    def _take_quota(self) -> None:
+        """Take a token from the shared quota for one upstream request."""
+        capacity = settings.rate_limit_per_hour
+        if not self._backend.take_token(
+            self._quota_key, capacity, capacity / 3600, self.quota_reserve
+        ):
+            raise QuotaExceededError(
+                f"Stat-Xplore quota of {capacity} requests/hour exhausted"
+            )
+
+    def _sync_quota(self, remaining: int) -> None:
+        """Lower the shared bucket to the quota upstream reports as remaining."""
+        capacity = settings.rate_limit_per_hour
+        self._backend.limit_tokens(
+            self._quota_key, capacity, capacity / 3600, remaining
+        )
+
+    def _sync_quota_from_headers(self, headers: httpx.Headers) -> None:
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        rate_limit = self._get_rate_limit_from_headers(headers)
+        if rate_limit is not None:
+            self._sync_quota(rate_limit.remaining)
+
+    def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request upstream, taking a token from the shared quota."""
+        self._take_quota()
+        response = self._client.request(method, url, **kwargs)
+        self._sync_quota_from_headers(response.headers)
+        response.raise_for_status()
+        return response
+
+    @contextmanager
+    def _stream(self, method: str, url: str, **kwargs) -> Iterator[httpx.Response]:
+        """Send a request upstream without buffering the response body."""
+        self._take_quota()
+        with self._client.stream(method, url, **kwargs) as response:
+            self._sync_quota_from_headers(response.headers)
+            if response.is_error:
+                response.read()
+            response.raise_for_status()
+            yield response
+
     def _get_rate_limit_from_headers(
         self, headers: httpx.Headers
     ) -> RateLimitInfo | None:
@@ -49,9 +137,13 @@ class StatXploreClient:
             Schema item with children.
         """
         url = "/schema" if not schema_id else f"/schema/{schema_id}"
-        response = self._client.get(url)
-        response.raise_for_status()
-        return SchemaItem.model_validate(response.json())
+        cache_key = f"schema:{schema_id or ''}"
+        cached = self._backend.get(cache_key)
+        if cached is not None:
+            return SchemaItem.model_validate_json(cached)
+        response = self._request("GET", url)
+        self._backend.set(cache_key, response.content, settings.schema_cache_ttl)
+        return SchemaItem.model_validate_json(response.content)
 
     def list_databases(self) -> list[SchemaItem]:
         """List all available databases (recursively finds all DATABASE items)."""
@@ -66,6 +158,8 @@ class StatXploreClient:
                 try:
                     fetched = self.get_schema(item.id)
                     item.children = fetched.children
+                except QuotaExceededError:
+                    raise
                 except Exception:
                     pass
             if item.children:
@@ -101,13 +195,15 @@ class StatXploreClient:
         Returns:
             Query results with fields, measures, and data cubes.
         """
-        response = self._client.post(
+        # Large cubes are parsed as they arrive rather than buffered as raw
+        # bytes, then a dict tree, then a model tree.
+        with self._stream(
+            "POST",
             "/table",
             json=query.model_dump(exclude_none=True),
             headers={"Content-Type": "application/json"},
-        )
-        response.raise_for_status()
-        return TableQueryResponse.model_validate(response.json())
+        ) as response:
+            return parse_table_response(response.iter_bytes())
 
     def query_table_simple(
         self,
@@ -129,40 +225,32 @@ class StatXploreClient:
         Returns:
             Query results.
         """
-        dimensions = [row_fields]
-        if column_fields:
-            dimensions.append(column_fields)
-
-        recodes = None
-        if filters:
-            recodes = {
-                field_id: {"map": [[v] for v in values]}
-                for field_id, values in filters.items()
-            }
-
-        query = TableQuery(
-            database=database,
-            measures=measures,
-            dimensions=dimensions,
-            recodes=recodes,
+        query = build_simple_query(
+            database, measures, row_fields, column_fields, filters
         )
         return self.query_table(query)
 
     def get_rate_limit(self) -> RateLimitInfo:
-        """Get current rate limit status."""
+        """Get current rate limit status.
+
+        Exempt from the shared quota so it still works once the quota is used
+        up, and used to bring the shared bucket in line with upstream.
+        """
         response = self._client.get("/rate_limit")
         response.raise_for_status()
         data = response.json()
-        return RateLimitInfo(
+        rate_limit = RateLimitInfo(
             limit=data.get("limit", 2000),
             remaining=data.get("remaining", 0),
             reset_timestamp=data.get("reset", 0),
         )
+        if "remaining" in data:
+            self._sync_quota(rate_limit.remaining)
+        return rate_limit
 
     def get_info(self) -> dict:
         """Get API instance information."""
-        response = self._client.get("/info")
-        response.raise_for_status()
+        response = self._request("GET", "/info")
         return response.json()
 
     def close(self) -> None:
@@ -1,5 +1,6 @@
 """Configuration settings."""
 
+import os
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -10,11 +11,42 @@ env_path = Path(__file__).parent.parent.parent / ".env"
 load_dotenv(env_path)
 
 
+def _default_cache_path() -> str:
+    """Per-user cache file, so users on one host neither clash nor share data."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return str(Path(base) / "stat-xplore-mcp" / "cache.sqlite3")
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment."""
 
     stat_xplore_api_key: str = ""
     stat_xplore_base_url: str = "https://stat-xplore.dwp.gov.uk/webapi/rest/v1"
 
+    # Seconds to wait for compatible table queries before sending them upstream
+    query_batch_window: float = 0.05
+
+    # Shared cache and quota backend: "memory", "sqlite" or "redis"
+    cache_backend: str = "sqlite"
+    cache_path: str = _default_cache_path()
+    redis_url: str = "redis://localhost:6379/0"
+    schema_cache_ttl: int = 3600
+    result_cache_ttl: int = 86400
+
+    # Query log used to pick queries for background prefetch
+    query_log_ttl: int = 7 * 86400
+    query_log_half_life: float = 86400
+    query_log_max_entries: int = 1000
+    # Seconds between prefetch runs in the API process (0 disables)
+    prefetch_interval: int = 900
+    prefetch_top_n: int = 20
+    # Refresh cached results that expire within this many seconds
+    prefetch_margin: int = 3600
+    # Fraction of the hourly quota prefetch leaves for live traffic
+    prefetch_quota_reserve: float = 0.5
+
+    # Upstream API-key quota, shared by every worker using the same backend
+    rate_limit_per_hour: int = 2000
+
 
 settings = Settings()
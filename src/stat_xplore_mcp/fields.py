@@ -0,0 +1,129 @@
+"""Paged, searchable index of field values."""
+
+import bisect
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from stat_xplore_mcp.backends import get_backend
+from stat_xplore_mcp.client import StatXploreClient
+from stat_xplore_mcp.config import settings
+from stat_xplore_mcp.models import FieldValue, FieldValuePage, SchemaItem
+
+# Number of field indexes kept in memory per process
+_MAX_INDEXES = 128
+
+
+def value_code(value_id: str) -> str:
+    """Return the code at the end of a value ID.
+
+    For example 'str:value:HBAI:V_F_HBAI:YEAR:C_HBAI_YEAR:2324' gives '2324'.
+    """
+    return value_id.rsplit(":", 1)[-1]
+
+
+class FieldValueIndex:
+    """Values of one field, indexed for prefix and label lookups."""
+
+    def __init__(self, field_id: str, values: list[FieldValue]):
+        self.field_id = field_id
+        self.values = values
+        self.built_at = time.time()
+        # Sorted (code, position) pairs for prefix lookups by bisection
+        self._codes = sorted(
+            (value_code(value.id).casefold(), i) for i, value in enumerate(values)
+        )
+        self._labels = [value.label.casefold() for value in values]
+
+    def page(
+        self,
+        prefix: str | None = None,
+        search: str | None = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> FieldValuePage:
+        """Return a page of values, in schema order.
+
+        Args:
+            prefix: Only include values whose code starts with this prefix.
+            search: Only include values whose label contains this text.
+            offset: Number of matching values to skip.
+            limit: Maximum number of values to return.
+
+        Returns:
+            The matching values and the total number of matches.
+        """
+        if prefix:
+            prefix = prefix.casefold()
+            start = bisect.bisect_left(self._codes, (prefix,))
+            positions = []
+            for code, position in self._codes[start:]:
+                if not code.startswith(prefix):
+                    break
+                positions.append(position)
+            positions.sort()
+        else:
+            positions = range(len(self.values))
+
+        if search:
+            search = search.casefold()
+            positions = [i for i in positions if search in self._labels[i]]
+
+        return FieldValuePage(
+            field=self.field_id,
+            total=len(positions),
+            offset=offset,
+            limit=limit,
+            values=[self.values[i] for i in positions[offset : offset + limit]],
+        )
+
+
+def _collect_values(
+    client: StatXploreClient, item: SchemaItem, values: list[FieldValue]
+) -> None:
+    for child in item.children or []:
+        if child.type == "VALUE" or child.id.startswith("str:value:"):
+            values.append(FieldValue(id=child.id, label=child.label))
+            continue
+        # Value sets and groups list their values one level further down
+        if child.children is None:
+            child = client.get_schema(child.id)
+        _collect_values(client, child, values)
+
+
+_lock = threading.Lock()
+_indexes: OrderedDict[str, FieldValueIndex] = OrderedDict()
+
+
+def get_field_index(client: StatXploreClient, field_id: str) -> FieldValueIndex:
+    """Get the value index for a field, building it on first use.
+
+    Indexes are kept in memory per process and their values are stored in the
+    shared backend, so only the first worker to see a field walks its schema.
+    """
+    with _lock:
+        index = _indexes.get(field_id)
+        if index is not None:
+            if time.time() - index.built_at < settings.schema_cache_ttl:
+                _indexes.move_to_end(field_id)
+                return index
+            del _indexes[field_id]
+
+    backend = get_backend()
+    cache_key = f"fieldvalues:{field_id}"
+    cached = backend.get(cache_key)
+    if cached is not None:
+        values = [FieldValue.model_validate(v) for v in json.loads(cached)]
+    else:
+        values = []
+        _collect_values(client, client.get_schema(field_id), values)
+        payload = json.dumps([value.model_dump() for value in values])
+        backend.set(cache_key, payload.encode(), settings.schema_cache_ttl)
+
+    index = FieldValueIndex(field_id, values)
+    with _lock:
+        _indexes[field_id] = index
+        while len(_indexes) > _MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
@@ -1,5 +1,12 @@
-"""Modal deployment for Stat-Xplore API."""
+"""Modal deployment for Stat-Xplore API.
 
+Containers share a cache, query log and rate limit only through Redis. To use
+it, deploy with STAT_XPLORE_REDIS_SECRET naming a Modal secret that provides
+REDIS_URL; the scheduled prefetch is only registered then, since with each
+container's own SQLite file it would have no query log to read.
+"""
+
+import os
 from pathlib import Path
 
 import modal
@@ -12,26 +19,40 @@ package_dir = Path(__file__).parent
 image = (
     modal.Image.debian_slim(python_version="3.11")
     .pip_install(
+        "brotli>=1.1.0",
         "fastapi>=0.115.0",
         "httpx>=0.28.0",
+        "ijson>=3.3.0",
         "pydantic>=2.10.0",
         "pydantic-settings>=2.7.0",
         "python-dotenv>=1.0.1",
+        "redis>=5.0.0",
+        "rich>=13.9.0",
         "uvicorn>=0.34.0",
     )
     .add_local_dir(package_dir, remote_path="/root/stat_xplore_mcp")
 )
 
+# Read at deploy time, and passed on so containers define the same functions
+redis_secret = os.environ.get("STAT_XPLORE_REDIS_SECRET")
+secrets = [modal.Secret.from_name("stat-xplore")]
+if redis_secret:
+    secrets += [
+        modal.Secret.from_name(redis_secret),
+        modal.Secret.from_dict(
+            {"CACHE_BACKEND": "redis", "STAT_XPLORE_REDIS_SECRET": redis_secret}
+        ),
+    ]
+
 
 @app.function(
     image=image,
-    secrets=[modal.Secret.from_name("stat-xplore")],
+    secrets=secrets,
     keep_warm=1,
 )
 @modal.asgi_app()
 def fastapi_app():
     """Deploy the FastAPI app to Modal."""
-    import os
     import sys
 
     # Add the source directory to path
@@ -39,12 +60,35 @@ def fastapi_app():
 
     # Set environment variable from Modal secret
     os.environ["STAT_XPLORE_API_KEY"] = os.environ.get("STAT_XPLORE_API_KEY", "")
+    if os.environ.get("CACHE_BACKEND") == "redis":
+        # Prefetch runs in the scheduled function below rather than in each
+        # container
+        os.environ.setdefault("PREFETCH_INTERVAL", "0")
 
     from stat_xplore_mcp.api import app as api_app
 
     return api_app
 
 
+if redis_secret:
+
+    @app.function(
+        image=image,
+        secrets=secrets,
+        schedule=modal.Period(minutes=15),
+    )
+    def prefetch():
+        """Refresh the hottest cached queries using spare quota."""
+        import sys
+
+        sys.path.insert(0, "/root")
+
+        from stat_xplore_mcp.prefetch import prefetch_hot_queries
+
+        refreshed = prefetch_hot_queries()
+        print(f"Prefetched {refreshed} queries")
+
+
 @app.local_entrypoint()
 def main():
     """Local entrypoint for testing."""
@@ -1,6 +1,11 @@
 """Pydantic models for Stat-Xplore API."""
 
-from pydantic import BaseModel, Field
+import math
+from array import array
+from typing import Any
+
+from pydantic import BaseModel, Field, GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic_core import core_schema
 
 
 class SchemaItem(BaseModel):
@@ -44,10 +49,66 @@ class MeasureInfo(BaseModel):
     label: str
 
 
+class CubeValues:
+    """Cube values held flat in a typed array until they are serialized.
+
+    ``data`` holds the cells in row-major order, as 64-bit integers or as
+    doubles, ``shape`` the length of the arrays at each depth of the nesting and
+    ``missing`` the positions of null cells. Validates only instances and
+    serializes as the nested list the API returns.
+    """
+
+    def __init__(self, data: array, shape: tuple[int, ...], missing: array):
+        self.data = data
+        self.shape = shape
+        self.missing = missing
+
+    def tolist(self) -> list:
+        """Return the values as nested lists, with None for missing cells."""
+        flat: list = self.data.tolist()
+        for position in self.missing:
+            flat[position] = None
+        for depth in range(len(self.shape) - 1, 0, -1):
+            size = self.shape[depth]
+            if size == 0:
+                # Empty innermost arrays hold no values to group
+                flat = [[] for _ in range(math.prod(self.shape[:depth]))]
+            else:
+                flat = [flat[i : i + size] for i in range(0, len(flat), size)]
+        return flat
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CubeValues):
+            other = other.tolist()
+        return isinstance(other, list) and self.tolist() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"CubeValues(shape={self.shape}, typecode={self.data.typecode!r})"
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls.tolist, return_schema=core_schema.list_schema()
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> dict:
+        return handler(core_schema.list_schema())
+
+
 class CubeData(BaseModel):
     """Cube data with values and precision."""
 
-    values: list
+    values: list | CubeValues
     precision: int = 0
 
 
@@ -74,3 +135,20 @@ class RecodeMap(BaseModel):
 
     map: list[list[str]]
     total: bool = False
+
+
+class FieldValue(BaseModel):
+    """A value of a field, usable in recode maps."""
+
+    id: str
+    label: str
+
+
+class FieldValuePage(BaseModel):
+    """A page of field values matching a filter."""
+
+    field: str
+    total: int
+    offset: int
+    limit: int
+    values: list[FieldValue] = Field(default_factory=list)
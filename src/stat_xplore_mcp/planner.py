@@ -0,0 +1,153 @@
+"""Query planner that merges compatible table queries."""
+
+import json
+import threading
+import time
+from collections.abc import Callable
+
+import httpx
+
+from stat_xplore_mcp.client import StatXploreClient
+from stat_xplore_mcp.config import settings
+from stat_xplore_mcp.models import TableQuery, TableQueryResponse
+from stat_xplore_mcp.querylog import query_log, result_cache
+
+
+def merge_key(query: TableQuery) -> str:
+    """Key identifying queries that can share one upstream request.
+
+    Queries are compatible when they target the same database with identical
+    dimensions and recodes, so only their measures differ.
+    """
+    return json.dumps(
+        [query.database, query.dimensions, query.recodes],
+        sort_keys=True,
+    )
+
+
+def is_query_error(error: Exception) -> bool:
+    """Whether ``error`` was caused by the query rather than by upstream load.
+
+    Only 4xx responses other than 429 point at a bad measure, so only those are
+    worth retrying query by query.
+    """
+    if not isinstance(error, httpx.HTTPStatusError):
+        return False
+    status = error.response.status_code
+    return 400 <= status < 500 and status != 429
+
+
+def split_response(
+    response: TableQueryResponse, measures: list[str]
+) -> TableQueryResponse:
+    """Extract the parts of a merged response that belong to one caller."""
+    wanted = set(measures)
+    return TableQueryResponse(
+        fields=response.fields,
+        measures=[m for m in response.measures if m.uri in wanted],
+        cubes={uri: response.cubes[uri] for uri in measures if uri in response.cubes},
+        database=response.database,
+    )
+
+
+class _Batch:
+    """Queries waiting to be sent upstream as a single request."""
+
+    def __init__(self, query: TableQuery):
+        self.query = query
+        self.measures: list[str] = []
+        self.callers = 0
+        self.done = threading.Event()
+        self.response: TableQueryResponse | None = None
+        self.error: Exception | None = None
+
+    def add(self, measures: list[str]) -> None:
+        self.callers += 1
+        for measure in measures:
+            if measure not in self.measures:
+                self.measures.append(measure)
+
+    def merged_query(self) -> TableQuery:
+        return self.query.model_copy(update={"measures": list(self.measures)})
+
+
+class QueryPlanner:
+    """Collects table queries over a short window and merges compatible ones.
+
+    The first caller for a given merge key waits for ``window`` seconds while
+    other callers add their measures, then sends one request with the union of
+    measures. Every caller gets back a response containing only the cubes for
+    the measures it asked for. If the merged request is rejected as invalid,
+    each caller retries its own query alone, so one bad measure does not fail
+    the whole batch. Other errors, such as timeouts or 5xx and 429 responses,
+    are raised to every caller rather than multiplying upstream load.
+
+    Queries are recorded in the query log once they succeed, so failing ones
+    never become candidates for prefetch, and results are served from and
+    stored in the shared result cache.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], StatXploreClient] = StatXploreClient,
+        window: float | None = None,
+    ):
+        self._client_factory = client_factory
+        self.window = settings.query_batch_window if window is None else window
+        self._lock = threading.Lock()
+        self._pending: dict[str, _Batch] = {}
+
+    def query_table(self, query: TableQuery) -> TableQueryResponse:
+        """Execute a table query, sharing the upstream request where possible.
+
+        Args:
+            query: The table query specification.
+
+        Returns:
+            Query results for the measures in ``query``.
+        """
+        cached = result_cache.get(query)
+        if cached is not None:
+            query_log.record(query)
+            return cached
+
+        key = merge_key(query)
+        with self._lock:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = _Batch(query)
+                self._pending[key] = batch
+            batch.add(query.measures)
+
+        if leader:
+            if self.window > 0:
+                time.sleep(self.window)
+            with self._lock:
+                del self._pending[key]
+            self._execute(batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is None:
+            response = split_response(batch.response, query.measures)
+        elif batch.callers == 1 or not is_query_error(batch.error):
+            raise batch.error
+        else:
+            with self._client_factory() as client:
+                response = client.query_table(query)
+        query_log.record(query)
+        result_cache.set(query, response)
+        return response
+
+    def _execute(self, batch: _Batch) -> None:
+        try:
+            with self._client_factory() as client:
+                batch.response = client.query_table(batch.merged_query())
+        except Exception as e:
+            batch.error = e
+        finally:
+            batch.done.set()
+
+
+planner = QueryPlanner()
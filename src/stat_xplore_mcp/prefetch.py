@@ -0,0 +1,111 @@
+"""Background prefetch of the hottest table queries."""
+
+import asyncio
+import time
+
+from rich.console import Console
+
+from stat_xplore_mcp.backends import QuotaExceededError, get_backend
+from stat_xplore_mcp.client import StatXploreClient
+from stat_xplore_mcp.config import settings
+from stat_xplore_mcp.models import TableQuery
+from stat_xplore_mcp.planner import is_query_error, merge_key, split_response
+from stat_xplore_mcp.querylog import query_hash, query_log, result_cache
+
+console = Console()
+
+
+def _lock_key(query: TableQuery) -> str:
+    return f"prefetch-lock:{query_hash(query)}"
+
+
+def _merged(queries: list[TableQuery]) -> TableQuery:
+    measures: list[str] = []
+    for query in queries:
+        measures.extend(m for m in query.measures if m not in measures)
+    return queries[0].model_copy(update={"measures": measures})
+
+
+def _refresh(client: StatXploreClient, queries: list[TableQuery]) -> int:
+    """Refresh ``queries`` with one merged request, or one each if it is invalid.
+
+    Returns:
+        Number of queries refreshed.
+    """
+    try:
+        response = client.query_table(_merged(queries))
+    except Exception as e:
+        if len(queries) == 1 or not is_query_error(e):
+            raise
+    else:
+        for query in queries:
+            result_cache.set(query, split_response(response, query.measures))
+        return len(queries)
+
+    refreshed = 0
+    for query in queries:
+        try:
+            result_cache.set(query, client.query_table(query))
+        except Exception as e:
+            if not is_query_error(e):
+                raise
+            console.print(f"[yellow]Prefetch of {query.measures} failed: {e}[/yellow]")
+            continue
+        refreshed += 1
+    return refreshed
+
+
+def prefetch_hot_queries() -> int:
+    """Re-execute the hottest logged queries whose cached results expire soon.
+
+    Only spare quota is used: requests stop once the shared token bucket falls
+    to ``settings.prefetch_quota_reserve`` of its capacity. Compatible queries
+    are merged as in the planner, and sent one by one if the merged request is
+    rejected as invalid. Each query is locked just before its request so
+    several workers don't refresh the same one, and unlocked again if the
+    request fails.
+
+    Returns:
+        Number of queries refreshed.
+    """
+    backend = get_backend()
+    refresh_before = time.time() + settings.prefetch_margin
+    lock_ttl = max(settings.prefetch_interval, 60)
+    groups: dict[str, list[TableQuery]] = {}
+    for query in query_log.hottest(settings.prefetch_top_n):
+        expires_at = result_cache.expires_at(query)
+        if expires_at is not None and expires_at > refresh_before:
+            continue
+        groups.setdefault(merge_key(query), []).append(query)
+
+    def unlock(queries: list[TableQuery]) -> None:
+        for query in queries:
+            backend.delete(_lock_key(query))
+
+    reserve = int(settings.rate_limit_per_hour * settings.prefetch_quota_reserve)
+    refreshed = 0
+    with StatXploreClient(quota_reserve=reserve) as client:
+        for group in groups.values():
+            queries = [q for q in group if backend.add(_lock_key(q), b"1", lock_ttl)]
+            if not queries:
+                continue
+            try:
+                refreshed += _refresh(client, queries)
+            except QuotaExceededError:
+                unlock(queries)
+                break
+            except Exception as e:
+                # Includes bodies that fail to parse, not only HTTP errors
+                unlock(queries)
+                console.print(f"[yellow]Prefetch failed: {e}[/yellow]")
+    return refreshed
+
+
+async def prefetch_loop() -> None:
+    """Run ``prefetch_hot_queries`` every ``settings.prefetch_interval`` seconds."""
+    while True:
+        try:
+            await asyncio.to_thread(prefetch_hot_queries)
+        except Exception as e:
+            console.print(f"[red]Prefetch run failed: {e}[/red]")
+        await asyncio.sleep(settings.prefetch_interval)
@@ -0,0 +1,222 @@
+"""Shared table result cache and log of executed queries."""
+
+import hashlib
+import json
+import struct
+import sys
+import time
+from array import array
+
+from stat_xplore_mcp.backends import Backend, get_backend
+from stat_xplore_mcp.config import settings
+from stat_xplore_mcp.models import (
+    CubeData,
+    CubeValues,
+    TableQuery,
+    TableQueryResponse,
+)
+
+
+def query_hash(query: TableQuery) -> str:
+    """Stable hash of a table query, independent of key order."""
+    payload = json.dumps(query.model_dump(exclude_none=True), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def _encode_entry(expires_at: float, response: TableQueryResponse) -> bytes:
+    """Pack a cached response as a JSON header followed by raw cube buffers.
+
+    Cubes held as typed arrays are copied byte for byte rather than expanded
+    into nested lists of Python numbers.
+    """
+    cubes: dict[str, dict] = {}
+    buffers: list[bytes] = []
+    for uri, cube in response.cubes.items():
+        if isinstance(cube.values, CubeValues):
+            values = cube.values
+            cubes[uri] = {
+                "precision": cube.precision,
+                "typecode": values.data.typecode,
+                "shape": values.shape,
+                "size": len(values.data),
+                "missing": len(values.missing),
+            }
+            buffers += [values.data.tobytes(), values.missing.tobytes()]
+        else:
+            cubes[uri] = cube.model_dump(mode="json")
+    header = json.dumps(
+        {
+            "expires_at": expires_at,
+            "byteorder": sys.byteorder,
+            "response": response.model_dump(mode="json", exclude={"cubes"}),
+            "cubes": cubes,
+        }
+    ).encode()
+    return b"".join([struct.pack("<I", len(header)), header, *buffers])
+
+
+def _decode_header(blob: bytes) -> tuple[dict, int]:
+    (length,) = struct.unpack_from("<I", blob)
+    return json.loads(blob[4 : 4 + length]), 4 + length
+
+
+def _read_array(typecode: str, view: memoryview, offset: int, size: int):
+    values = array(typecode)
+    end = offset + size * values.itemsize
+    values.frombytes(view[offset:end])
+    return values, end
+
+
+def _decode_entry(blob: bytes) -> TableQueryResponse:
+    header, offset = _decode_header(blob)
+    view = memoryview(blob)
+    swap = header["byteorder"] != sys.byteorder
+    cubes: dict[str, CubeData] = {}
+    for uri, spec in header["cubes"].items():
+        if "typecode" not in spec:
+            cubes[uri] = CubeData.model_validate(spec)
+            continue
+        data, offset = _read_array(spec["typecode"], view, offset, spec["size"])
+        missing, offset = _read_array("q", view, offset, spec["missing"])
+        if swap:
+            data.byteswap()
+            missing.byteswap()
+        values = CubeValues(data, tuple(spec["shape"]), missing)
+        cubes[uri] = CubeData.model_construct(
+            values=values, precision=spec["precision"]
+        )
+    response = TableQueryResponse.model_validate(header["response"])
+    response.cubes = cubes
+    return response
+
+
+class ResultCache:
+    """Table query results cached in the shared backend."""
+
+    def __init__(self, backend: Backend | None = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> Backend:
+        return self._backend or get_backend()
+
+    def get(self, query: TableQuery) -> TableQueryResponse | None:
+        """Return the cached response for ``query``, if any."""
+        cached = self.backend.get(f"table:{query_hash(query)}")
+        return _decode_entry(cached) if cached is not None else None
+
+    def expires_at(self, query: TableQuery) -> float | None:
+        """Return when the cached response for ``query`` expires, if cached."""
+        cached = self.backend.get(f"table:{query_hash(query)}")
+        if cached is None:
+            return None
+        header, _ = _decode_header(cached)
+        return header["expires_at"]
+
+    def set(self, query: TableQuery, response: TableQueryResponse) -> None:
+        """Cache ``response`` for ``query`` for ``settings.result_cache_ttl``."""
+        ttl = settings.result_cache_ttl
+        entry = _encode_entry(time.time() + ttl, response)
+        self.backend.set(f"table:{query_hash(query)}", entry, ttl)
+
+
+# Key of the shared score set ranking logged queries
+_SCORES_KEY = "querylog:scores"
+# The decay landmark moves forward after this many half-lives
+_ERA_HALF_LIVES = 32
+# The score set is trimmed to settings.query_log_max_entries every this many
+# records per process
+_TRIM_EVERY = 100
+
+
+class QueryLog:
+    """Frequency and recency of executed table queries.
+
+    Each query is stored once under its hash, and ranked in a shared score set
+    using forward decay: a hit at time ``t`` adds ``2 ** ((t - landmark) /
+    half_life)``, so comparing scores compares hit counts halved for every
+    half-life since each hit. The landmark moves forward every
+    ``_ERA_HALF_LIVES`` half-lives and existing scores are scaled down to
+    match, keeping them within float range. The set is pruned of queries whose
+    log entry has expired and trimmed to ``settings.query_log_max_entries``.
+    """
+
+    def __init__(self, backend: Backend | None = None):
+        self._backend = backend
+        self._era: int | None = None
+        self._records = 0
+
+    @property
+    def backend(self) -> Backend:
+        return self._backend or get_backend()
+
+    def _era_length(self) -> float:
+        return settings.query_log_half_life * _ERA_HALF_LIVES
+
+    def _advance_era(self, era: int) -> None:
+        """Rescale scores once, across all workers, when a new era starts."""
+        if era == self._era:
+            return
+        era_length = self._era_length()
+        if self.backend.add(f"querylog:rescale:{era}", b"1", era_length * 2):
+            stored = self.backend.get("querylog:era")
+            if stored is None:
+                # Scores from an unknown era can't be compared with new ones
+                self.backend.trim_scores(_SCORES_KEY, 0)
+            elif int(stored) < era:
+                factor = 2.0 ** (-_ERA_HALF_LIVES * (era - int(stored)))
+                self.backend.scale_scores(_SCORES_KEY, factor)
+            self.backend.set("querylog:era", str(era).encode(), era_length * 4)
+        self._era = era
+
+    def record(self, query: TableQuery) -> None:
+        """Record one execution of ``query``."""
+        now = time.time()
+        era = int(now // self._era_length())
+        self._advance_era(era)
+
+        key = query_hash(query)
+        entry = {"query": query.model_dump(exclude_none=True)}
+        self.backend.set(
+            f"querylog:{key}", json.dumps(entry).encode(), settings.query_log_ttl
+        )
+        landmark = era * self._era_length()
+        weight = 2.0 ** ((now - landmark) / settings.query_log_half_life)
+        self.backend.incr_score(_SCORES_KEY, key, weight)
+
+        self._records += 1
+        if self._records % _TRIM_EVERY == 0:
+            self.backend.trim_scores(_SCORES_KEY, settings.query_log_max_entries)
+
+    def hottest(self, count: int) -> list[TableQuery]:
+        """Return the ``count`` queries with the highest recency-weighted hits.
+
+        Queries not seen within ``settings.query_log_ttl`` are removed from the
+        ranking as they are found.
+        """
+        self._advance_era(int(time.time() // self._era_length()))
+        hottest: list[TableQuery] = []
+        seen: set[str] = set()
+        # Removing expired members may let live ones move up, so look again
+        for _ in range(3):
+            expired = False
+            for key, _score in self.backend.top_scores(_SCORES_KEY, count * 2):
+                if key in seen:
+                    continue
+                cached = self.backend.get(f"querylog:{key}")
+                if cached is None:
+                    self.backend.remove_score(_SCORES_KEY, key)
+                    expired = True
+                    continue
+                seen.add(key)
+                entry = json.loads(cached)
+                hottest.append(TableQuery.model_validate(entry["query"]))
+                if len(hottest) == count:
+                    return hottest
+            if not expired:
+                break
+        return hottest
+
+
+result_cache = ResultCache()
+query_log = QueryLog()
@@ -0,0 +1,141 @@
+"""Precompressed, conditionally cacheable HTTP responses."""
+
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Number of responses kept per ResponseMemo, least recently used evicted first
+_MAX_MEMO_ENTRIES = 1024
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CachedResponse:
+    """A response body hashed once, compressed once per encoding, served many times.
+
+    Serves gzip or brotli variants according to ``Accept-Encoding``, each with
+    its own strong ETag since their bytes differ, and answers matching
+    ``If-None-Match`` requests with 304 Not Modified. Each variant is only
+    compressed when first requested. Brotli's top quality is slow on large
+    bodies, so pass a lower ``brotli_quality`` for responses built on demand.
+    """
+
+    def __init__(
+        self, body: bytes, media_type: str, max_age: int, brotli_quality: int = 11
+    ):
+        self.media_type = media_type
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.cache_control = f"public, max-age={max_age}"
+        self.brotli_quality = brotli_quality
+        self.encodings = ("identity", "gzip", "br") if brotli else ("identity", "gzip")
+        self.etags = {
+            encoding: f'"{digest}"'
+            if encoding == "identity"
+            else f'"{digest}-{encoding}"'
+            for encoding in self.encodings
+        }
+        self._lock = threading.Lock()
+        self._variants = {"identity": body}
+
+    def encoding(self, request: Request) -> str:
+        """The content coding to serve ``request`` with."""
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        return next(
+            (e for e in ("br", "gzip") if e in accepted and e in self.encodings),
+            "identity",
+        )
+
+    def variant(self, encoding: str) -> bytes:
+        """The body in ``encoding``, compressing it on first use."""
+        with self._lock:
+            body = self._variants.get(encoding)
+            if body is None:
+                identity = self._variants["identity"]
+                if encoding == "gzip":
+                    body = gzip.compress(identity, 9)
+                else:
+                    body = brotli.compress(identity, quality=self.brotli_quality)
+                self._variants[encoding] = body
+            return body
+
+    def not_modified(self, request: Request, encoding: str) -> bool:
+        """Whether the client already holds the ``encoding`` variant."""
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        return "*" in tags or self.etags[encoding] in tags
+
+    def respond(self, request: Request) -> Response:
+        """Build the response for ``request``."""
+        encoding = self.encoding(request)
+        headers = {
+            "ETag": self.etags[encoding],
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if self.not_modified(request, encoding):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(
+            content=self.variant(encoding),
+            media_type=self.media_type,
+            headers=headers,
+        )
+
+
+class ResponseMemo:
+    """Per-process LRU of cached responses that expire after ``ttl`` seconds."""
+
+    def __init__(self, ttl: int, max_entries: int = _MAX_MEMO_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._responses: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def get(self, key: str, build: Callable[[], CachedResponse]) -> CachedResponse:
+        """Return the response stored under ``key``, building it if missing."""
+        now = time.time()
+        with self._lock:
+            entry = self._responses.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._responses.move_to_end(key)
+                    return entry[1]
+                del self._responses[key]
+        response = build()
+        with self._lock:
+            self._responses[key] = (now + self.ttl, response)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+        return response
@@ -1,5 +1,6 @@
 """MCP server for Stat-Xplore API."""
 
+import asyncio
 import json
 
 from mcp.server import Server
@@ -7,6 +8,8 @@ from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, Tool
 
 from stat_xplore_mcp.client import StatXploreClient
+from stat_xplore_mcp.fields import get_field_index
+from stat_xplore_mcp.planner import planner
 
 server = Server("stat-xplore")
 
@@ -100,6 +103,48 @@ async def list_tools() -> list[Tool]:
                 "required": [],
             },
         ),
+        Tool(
+            name="list_field_values",
+            description=(
+                "List value IDs for a field (for building recodes), with paging. "
+                "Filter by code prefix (e.g. 'E09' for London boroughs) or label text."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "field_id": {
+                        "type": "string",
+                        "description": (
+                            "Field ID (e.g., 'str:field:HBAI:V_F_HBAI:YEAR')"
+                        ),
+                    },
+                    "prefix": {
+                        "type": "string",
+                        "description": (
+                            "Only values whose code (last ID segment) starts with this"
+                        ),
+                    },
+                    "search": {
+                        "type": "string",
+                        "description": (
+                            "Only values whose label contains this text "
+                            "(case-insensitive)"
+                        ),
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Number of matching values to skip (default 0)",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": (
+                            "Maximum values to return (default 100, max 1000)"
+                        ),
+                    },
+                },
+                "required": ["field_id"],
+            },
+        ),
     ]
 
 
@@ -132,7 +177,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 dimensions=arguments["dimensions"],
                 recodes=arguments.get("recodes"),
             )
-            result = client.query_table(query)
+            result = await asyncio.to_thread(planner.query_table, query)
             return [
                 TextContent(type="text", text=json.dumps(result.model_dump(), indent=2))
             ]
@@ -152,6 +197,21 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 TextContent(type="text", text=json.dumps(schema.model_dump(), indent=2))
             ]
 
+        elif name == "list_field_values":
+            # Building an index may walk many value sets upstream
+            index = await asyncio.to_thread(
+                get_field_index, client, arguments["field_id"]
+            )
+            page = index.page(
+                prefix=arguments.get("prefix"),
+                search=arguments.get("search"),
+                offset=max(0, arguments.get("offset", 0)),
+                limit=min(max(1, arguments.get("limit", 100)), 1000),
+            )
+            return [
+                TextContent(type="text", text=json.dumps(page.model_dump(), indent=2))
+            ]
+
         else:
             return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
@@ -161,7 +221,6 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 
 def main():
     """Run the MCP server."""
-    import asyncio
 
     async def run():
         async with stdio_server() as (read_stream, write_stream):
@@ -0,0 +1,169 @@
+"""Incremental parsing of large table query responses.
+
+The upstream body is never held in memory as a whole: metadata such as
+``fields`` and ``measures`` is built as it arrives, and cube values are
+appended straight into flat typed buffers that are kept until serialization.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator
+
+import ijson
+
+from stat_xplore_mcp.models import CubeData, CubeValues, TableQueryResponse
+
+Events = Iterator[tuple[str, str, object]]
+
+
+class _ChunkReader:
+    """File-like wrapper around an iterator of byte chunks, as ijson expects."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+
+    def read(self, size: int = -1) -> bytes:
+        # ijson calls read(0) to check whether the stream yields bytes
+        if size == 0:
+            return b""
+        for chunk in self._chunks:
+            if chunk:
+                return chunk
+        return b""
+
+
+class _CubeBuffer:
+    """Cube values stored flat plus the shape of the nesting.
+
+    Values are kept as 64-bit integers until the first non-integer arrives,
+    then as doubles. Arrays must be rectangular, with values only at the
+    innermost depth.
+    """
+
+    def __init__(self):
+        self.values = array("q")
+        self.missing = array("q")
+        self.precision = 0
+        self._counts: list[int] = []
+        self._shape: dict[int, int] = {}
+        self._leaf_depth: int | None = None
+
+    def start_array(self) -> None:
+        if self._counts:
+            self._counts[-1] += 1
+        self._counts.append(0)
+
+    def end_array(self) -> None:
+        depth = len(self._counts) - 1
+        count = self._counts.pop()
+        expected = self._shape.setdefault(depth, count)
+        if count != expected:
+            raise ValueError(
+                f"Ragged cube values: arrays at depth {depth} have "
+                f"{expected} and {count} items"
+            )
+
+    def add(self, value) -> None:
+        depth = len(self._counts) - 1
+        if self._leaf_depth is None:
+            self._leaf_depth = depth
+        elif depth != self._leaf_depth:
+            raise ValueError(
+                f"Ragged cube values: values at depths {self._leaf_depth} and {depth}"
+            )
+        if self._counts:
+            self._counts[-1] += 1
+        if value is None:
+            self.missing.append(len(self.values))
+            value = 0
+        elif isinstance(value, float) and self.values.typecode == "q":
+            self.values = array("d", self.values)
+        self.values.append(value)
+
+    def to_cube(self) -> CubeData:
+        shape = tuple(self._shape[depth] for depth in sorted(self._shape))
+        if not shape:
+            raise ValueError("Cube values must be an array")
+        if self._leaf_depth is not None and self._leaf_depth != len(shape) - 1:
+            raise ValueError("Ragged cube values: arrays nested below values")
+        values = CubeValues(self.values, shape, self.missing)
+        return CubeData.model_construct(values=values, precision=self.precision)
+
+
+def _build_value(events: Events):
+    """Build the next complete JSON value from ``events``."""
+    builder = ijson.ObjectBuilder()
+    depth = 0
+    for _, event, value in events:
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            return builder.value
+
+
+def _read_values(events: Events, cube: _CubeBuffer) -> None:
+    depth = 0
+    for _, event, value in events:
+        if event == "start_array":
+            cube.start_array()
+            depth += 1
+        elif event == "end_array":
+            cube.end_array()
+            depth -= 1
+        elif event in ("number", "null"):
+            cube.add(value)
+        else:
+            raise ValueError(f"Unexpected {event} in cube values")
+        if depth == 0:
+            return
+
+
+def _parse_cube(events: Events) -> CubeData:
+    cube = _CubeBuffer()
+    next(events)  # start_map
+    for _, event, value in events:
+        if event == "end_map":
+            break
+        if value == "values":
+            _read_values(events, cube)
+        elif value == "precision":
+            cube.precision = int(_build_value(events))
+        else:
+            _build_value(events)
+    return cube.to_cube()
+
+
+def _parse_cubes(events: Events) -> dict[str, CubeData]:
+    cubes: dict[str, CubeData] = {}
+    next(events)  # start_map
+    for _, event, value in events:
+        if event == "end_map":
+            break
+        cubes[value] = _parse_cube(events)
+    return cubes
+
+
+def parse_table_response(chunks: Iterable[bytes]) -> TableQueryResponse:
+    """Parse a table query response from a stream of byte chunks.
+
+    Args:
+        chunks: The response body, for example from ``Response.iter_bytes()``.
+
+    Returns:
+        The parsed query results.
+    """
+    events = ijson.parse(_ChunkReader(chunks), use_float=True)
+    metadata: dict = {}
+    cubes: dict[str, CubeData] = {}
+    for prefix, event, value in events:
+        if event != "map_key" or prefix != "":
+            continue
+        if value == "cubes":
+            cubes = _parse_cubes(events)
+        else:
+            metadata[value] = _build_value(events)
+    response = TableQueryResponse.model_validate(metadata)
+    response.cubes = cubes
+    return response
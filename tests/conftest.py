@@ -0,0 +1,92 @@
+"""Shared test fixtures."""
+
+import threading
+
+import httpx
+import ijson
+import pytest
+
+from stat_xplore_mcp.backends import get_backend
+from stat_xplore_mcp.config import settings
+from stat_xplore_mcp.models import CubeData, MeasureInfo, TableQuery, TableQueryResponse
+
+
+@pytest.fixture(autouse=True)
+def memory_backend(monkeypatch):
+    """Give every test a fresh in-process backend."""
+    monkeypatch.setattr(settings, "cache_backend", "memory")
+    get_backend.cache_clear()
+    yield get_backend()
+    get_backend.cache_clear()
+
+
+@pytest.fixture
+def make_query():
+    """Build a table query over HBAI years for the given measures."""
+
+    def make(*measures: str, recodes: dict | None = None) -> TableQuery:
+        return TableQuery(
+            database="str:database:HBAI",
+            measures=list(measures),
+            dimensions=[["str:field:HBAI:V_F_HBAI:YEAR"]],
+            recodes=recodes,
+        )
+
+    return make
+
+
+def status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://stat-xplore.test/table")
+    response = httpx.Response(status, request=request)
+    return httpx.HTTPStatusError(str(status), request=request, response=response)
+
+
+# Measures that make FakeClient fail, and how
+FAILURES = {
+    "bad": lambda: status_error(400),
+    "busy": lambda: status_error(429),
+    "down": lambda: status_error(503),
+    "slow": lambda: httpx.ReadTimeout("timed out"),
+    "garbled": lambda: ijson.IncompleteJSONError("premature EOF"),
+}
+
+
+class FakeClient:
+    """Stands in for StatXploreClient, recording each upstream query.
+
+    Queries for a measure in ``FAILURES`` raise its error, and every query
+    raises ``error`` if one is given. Calling the client returns itself, so it
+    can also stand in for the class or a client factory.
+    """
+
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.calls: list[TableQuery] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, **kwargs):
+        return self
+
+    def query_table(self, query: TableQuery) -> TableQueryResponse:
+        with self._lock:
+            self.calls.append(query)
+        if self.error is not None:
+            raise self.error
+        for measure in query.measures:
+            if measure in FAILURES:
+                raise FAILURES[measure]()
+        return TableQueryResponse(
+            measures=[MeasureInfo(uri=m, label=m) for m in query.measures],
+            cubes={m: CubeData(values=[len(m)]) for m in query.measures},
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_client():
+    return FakeClient()
@@ -0,0 +1,118 @@
+"""Tests for the shared cache and quota backends."""
+
+import multiprocessing
+import time
+
+import fakeredis
+import pytest
+
+from stat_xplore_mcp.backends import MemoryBackend, RedisBackend, SQLiteBackend
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    return RedisBackend(client=fakeredis.FakeRedis())
+
+
+def test_get_set_delete(backend):
+    assert backend.get("a") is None
+    backend.set("a", b"1", 10)
+    assert backend.get("a") == b"1"
+    backend.delete("a")
+    assert backend.get("a") is None
+
+
+def test_values_expire(backend):
+    backend.set("a", b"1", 0.05)
+    time.sleep(0.1)
+    assert backend.get("a") is None
+
+
+def test_add_only_sets_absent_keys(backend):
+    assert backend.add("lock", b"1", 10)
+    assert not backend.add("lock", b"2", 10)
+    assert backend.get("lock") == b"1"
+
+
+def test_add_replaces_expired_keys(backend):
+    assert backend.add("lock", b"1", 0.05)
+    time.sleep(0.1)
+    assert backend.add("lock", b"2", 10)
+
+
+def test_scores(backend):
+    backend.incr_score("z", "a")
+    backend.incr_score("z", "b", 3)
+    backend.incr_score("z", "a", 0.5)
+    assert backend.top_scores("z", 5) == [("b", 3.0), ("a", 1.5)]
+    assert backend.top_scores("z", 1) == [("b", 3.0)]
+
+
+def test_take_token_empties_bucket(backend):
+    taken = [backend.take_token("quota", 5, 0.0) for _ in range(8)]
+    assert taken == [True] * 5 + [False] * 3
+
+
+def test_take_token_respects_reserve(backend):
+    assert sum(backend.take_token("quota", 5, 0.0, reserve=2) for _ in range(8)) == 3
+    # Callers without a reserve can still use the reserved tokens
+    assert sum(backend.take_token("quota", 5, 0.0) for _ in range(8)) == 2
+
+
+def test_take_token_refills(backend):
+    for _ in range(2):
+        backend.take_token("quota", 2, 20.0)
+    time.sleep(0.1)
+    assert backend.take_token("quota", 2, 20.0)
+
+
+def test_limit_tokens_lowers_but_never_raises(backend):
+    backend.limit_tokens("quota", 10, 0.0, 3)
+    assert sum(backend.take_token("quota", 10, 0.0) for _ in range(10)) == 3
+    backend.limit_tokens("quota", 10, 0.0, 8)
+    assert not backend.take_token("quota", 10, 0.0)
+
+
+def test_sqlite_creates_a_private_cache_directory(tmp_path):
+    path = tmp_path / "cache" / "stat-xplore-mcp" / "cache.sqlite3"
+    backend = SQLiteBackend(str(path))
+    backend.set("a", b"1", 10)
+
+    assert backend.get("a") == b"1"
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+
+
+def test_sqlite_sweeps_expired_rows(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    for i in range(50):
+        backend.set(f"old{i}", b"x", 0.01)
+    time.sleep(0.05)
+    for i in range(50):
+        backend.set(f"new{i}", b"x", 10)
+    (rows,) = backend._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+    assert rows == 50
+
+
+def _take_tokens(path: str, attempts: int, results) -> None:
+    backend = SQLiteBackend(path)
+    results.put(sum(backend.take_token("quota", 50, 0.0) for _ in range(attempts)))
+
+
+def test_sqlite_take_token_is_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteBackend(path)  # create the schema before the workers race
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_take_tokens, args=(path, 30, results))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    taken = sum(results.get(timeout=30) for _ in workers)
+    for worker in workers:
+        worker.join()
+    assert taken == 50
@@ -0,0 +1,55 @@
+"""Tests for quota handling in the Stat-Xplore client."""
+
+import httpx
+import pytest
+
+from stat_xplore_mcp.backends import QuotaExceededError
+from stat_xplore_mcp.client import StatXploreClient
+from stat_xplore_mcp.config import settings
+
+
+def make_client(handler, monkeypatch, capacity=5) -> StatXploreClient:
+    monkeypatch.setattr(settings, "rate_limit_per_hour", capacity)
+    client = StatXploreClient(api_key="test")
+    client._client = httpx.Client(
+        base_url=client.base_url, transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+def info_handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("/rate_limit"):
+        return httpx.Response(200, json={"limit": 2000, "remaining": 0, "reset": 1})
+    return httpx.Response(200, json={}, headers={"X-RateLimit-Remaining": "2"})
+
+
+def test_requests_take_quota(monkeypatch):
+    client = make_client(lambda r: httpx.Response(200, json={}), monkeypatch)
+    for _ in range(5):
+        client.get_info()
+    with pytest.raises(QuotaExceededError):
+        client.get_info()
+
+
+def test_rate_limit_is_exempt_from_quota(monkeypatch):
+    client = make_client(info_handler, monkeypatch, capacity=1)
+    client.get_info()
+    with pytest.raises(QuotaExceededError):
+        client.get_info()
+    assert client.get_rate_limit().remaining == 0
+
+
+def test_bucket_follows_upstream_remaining_header(monkeypatch):
+    client = make_client(info_handler, monkeypatch, capacity=100)
+    client.get_info()  # upstream reports 2 remaining
+    client.get_info()
+    client.get_info()
+    with pytest.raises(QuotaExceededError):
+        client.get_info()
+
+
+def test_bucket_follows_rate_limit_endpoint(monkeypatch):
+    client = make_client(info_handler, monkeypatch, capacity=100)
+    client.get_rate_limit()  # upstream reports 0 remaining
+    with pytest.raises(QuotaExceededError):
+        client.get_info()
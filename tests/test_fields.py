@@ -0,0 +1,150 @@
+"""Tests for the paged, searchable field value index."""
+
+from collections import OrderedDict
+
+import httpx
+import pytest
+
+from stat_xplore_mcp import fields
+from stat_xplore_mcp.client import StatXploreClient
+from stat_xplore_mcp.fields import FieldValueIndex, get_field_index
+from stat_xplore_mcp.models import FieldValue
+
+FIELD = "str:field:LA:V_F_LA:AREA"
+PREFIX = "str:value:LA:V_F_LA:AREA:C_AREA"
+
+AREAS = [
+    ("E09000001", "City of London"),
+    ("S12000033", "Aberdeen City"),
+    ("E09000002", "Barking and Dagenham"),
+    ("E08000003", "Manchester"),
+    ("e09000033", "Westminster"),
+]
+
+
+def value(code: str, label: str) -> FieldValue:
+    return FieldValue(id=f"{PREFIX}:{code}", label=label)
+
+
+@pytest.fixture
+def index() -> FieldValueIndex:
+    return FieldValueIndex(FIELD, [value(code, label) for code, label in AREAS])
+
+
+def labels(page) -> list[str]:
+    return [v.label for v in page.values]
+
+
+def test_prefix_lookup_is_case_insensitive_in_schema_order(index):
+    page = index.page(prefix="E09")
+    assert labels(page) == ["City of London", "Barking and Dagenham", "Westminster"]
+    assert page.total == 3
+    assert labels(index.page(prefix="e0800")) == ["Manchester"]
+
+
+def test_unmatched_prefix_returns_nothing(index):
+    for prefix in ("W", "E1", "Z", "E090000019"):
+        page = index.page(prefix=prefix)
+        assert page.total == 0
+        assert page.values == []
+
+
+def test_search_matches_labels(index):
+    assert labels(index.page(search="city")) == ["City of London", "Aberdeen City"]
+    assert labels(index.page(prefix="E", search="CITY")) == ["City of London"]
+
+
+def test_paging(index):
+    page = index.page(offset=1, limit=2)
+    assert labels(page) == ["Aberdeen City", "Barking and Dagenham"]
+    assert (page.total, page.offset, page.limit) == (5, 1, 2)
+    assert index.page(offset=10).values == []
+
+
+SCHEMA = {
+    FIELD: {
+        "id": FIELD,
+        "label": "Area",
+        "location": "",
+        "children": [
+            {
+                "id": "str:valueset:LA:V_F_LA:AREA:C_ENG",
+                "label": "England",
+                "location": "",
+                "type": "VALUESET",
+            },
+            {
+                "id": "str:group:LA:V_F_LA:AREA:SCOT",
+                "label": "Scotland",
+                "location": "",
+                "type": "GROUP",
+                "children": [
+                    {
+                        "id": f"{PREFIX}:S12000033",
+                        "label": "Aberdeen City",
+                        "location": "",
+                        "type": "VALUE",
+                    },
+                ],
+            },
+        ],
+    },
+    "str:valueset:LA:V_F_LA:AREA:C_ENG": {
+        "id": "str:valueset:LA:V_F_LA:AREA:C_ENG",
+        "label": "England",
+        "location": "",
+        "children": [
+            {"id": f"{PREFIX}:E09000001", "label": "City of London", "location": ""},
+            {
+                "id": f"{PREFIX}:E08000003",
+                "label": "Manchester",
+                "location": "",
+                "type": "VALUE",
+            },
+        ],
+    },
+}
+
+
+@pytest.fixture
+def schema_requests(monkeypatch) -> list[str]:
+    monkeypatch.setattr(fields, "_indexes", OrderedDict())
+    return []
+
+
+def make_client(schema_requests: list[str]) -> StatXploreClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        schema_id = request.url.path.split("/schema/", 1)[1]
+        schema_requests.append(schema_id)
+        return httpx.Response(200, json=SCHEMA[schema_id])
+
+    client = StatXploreClient(api_key="test")
+    client._client = httpx.Client(
+        base_url=client.base_url, transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+def test_index_walks_nested_value_sets(schema_requests):
+    index = get_field_index(make_client(schema_requests), FIELD)
+
+    assert [v.label for v in index.values] == [
+        "City of London",
+        "Manchester",
+        "Aberdeen City",
+    ]
+    assert schema_requests == [FIELD, "str:valueset:LA:V_F_LA:AREA:C_ENG"]
+
+
+def test_index_values_are_reused_from_the_backend(schema_requests, memory_backend):
+    get_field_index(make_client(schema_requests), FIELD)
+    # A fresh process: no in-memory index and no cached schema responses
+    fields._indexes.clear()
+    for schema_id in SCHEMA:
+        memory_backend.delete(f"schema:{schema_id}")
+    schema_requests.clear()
+
+    index = get_field_index(make_client(schema_requests), FIELD)
+
+    assert schema_requests == []
+    assert labels(index.page(prefix="E08")) == ["Manchester"]
@@ -0,0 +1,146 @@
+"""Tests for merging compatible table queries."""
+
+import threading
+
+import httpx
+import pytest
+
+from stat_xplore_mcp.models import CubeData, MeasureInfo, TableQuery, TableQueryResponse
+from stat_xplore_mcp.planner import QueryPlanner, merge_key, split_response
+from stat_xplore_mcp.querylog import query_log
+
+
+@pytest.fixture
+def calls(fake_client):
+    return fake_client.calls
+
+
+@pytest.fixture
+def make_planner(fake_client):
+    def make(window: float) -> QueryPlanner:
+        return QueryPlanner(client_factory=fake_client, window=window)
+
+    return make
+
+
+def run_concurrently(planner: QueryPlanner, queries: list[TableQuery]) -> list:
+    """Run queries in parallel threads, returning each result or exception."""
+    results: list = [None] * len(queries)
+    barrier = threading.Barrier(len(queries))
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = planner.query_table(queries[i])
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(queries))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_merge_key_ignores_measures(make_query):
+    assert merge_key(make_query("a")) == merge_key(make_query("b"))
+    assert merge_key(make_query("a")) != merge_key(make_query("a", recodes={"f": {}}))
+
+
+def test_split_response_keeps_caller_measures_in_order():
+    response = TableQueryResponse(
+        measures=[MeasureInfo(uri=m, label=m) for m in ("a", "b", "c")],
+        cubes={m: CubeData(values=[i]) for i, m in enumerate(("a", "b", "c"))},
+    )
+    split = split_response(response, ["c", "a"])
+    assert [m.uri for m in split.measures] == ["a", "c"]
+    assert list(split.cubes) == ["c", "a"]
+    assert split.cubes["c"].values == [2]
+
+
+def test_concurrent_compatible_queries_share_one_request(
+    make_planner, make_query, calls
+):
+    planner = make_planner(window=0.2)
+    results = run_concurrently(
+        planner, [make_query("a"), make_query("bb"), make_query("a")]
+    )
+
+    assert len(calls) == 1
+    assert calls[0].measures == ["a", "bb"] or calls[0].measures == ["bb", "a"]
+    assert list(results[0].cubes) == ["a"]
+    assert results[1].cubes["bb"].values == [2]
+    assert [m.uri for m in results[2].measures] == ["a"]
+
+
+def test_incompatible_queries_are_not_merged(make_planner, make_query, calls):
+    planner = make_planner(window=0.2)
+    run_concurrently(planner, [make_query("a"), make_query("b", recodes={"f": {}})])
+    assert len(calls) == 2
+
+
+def test_queries_outside_the_window_are_sent_separately(
+    make_planner, make_query, calls
+):
+    planner = make_planner(window=0)
+    planner.query_table(make_query("a"))
+    planner.query_table(make_query("b"))
+    assert [c.measures for c in calls] == [["a"], ["b"]]
+
+
+def test_failed_merge_retries_each_caller_alone(make_planner, make_query, calls):
+    planner = make_planner(window=0.2)
+    results = run_concurrently(
+        planner, [make_query("a"), make_query("bad"), make_query("c")]
+    )
+
+    assert results[0].cubes["a"].values == [1]
+    assert results[2].cubes["c"].values == [1]
+    assert isinstance(results[1], httpx.HTTPStatusError)
+    # One merged attempt, then one retry per caller
+    assert len(calls) == 4
+
+
+@pytest.mark.parametrize("measure", ["busy", "down", "slow"])
+def test_upstream_errors_are_raised_without_retry(
+    make_planner, make_query, calls, measure
+):
+    planner = make_planner(window=0.2)
+    results = run_concurrently(planner, [make_query("a"), make_query(measure)])
+
+    assert all(isinstance(r, httpx.HTTPError) for r in results)
+    assert len(calls) == 1
+
+
+def test_failed_retries_raise_distinct_exceptions(make_planner, make_query):
+    planner = make_planner(window=0.2)
+    results = run_concurrently(planner, [make_query("bad"), make_query("bad", "a")])
+    assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+    assert results[0] is not results[1]
+
+
+def test_single_caller_error_is_raised_without_retry(make_planner, make_query, calls):
+    planner = make_planner(window=0)
+    with pytest.raises(httpx.HTTPStatusError):
+        planner.query_table(make_query("bad"))
+    assert len(calls) == 1
+
+
+def test_results_are_served_from_cache(make_planner, make_query, calls):
+    planner = make_planner(window=0)
+    first = planner.query_table(make_query("a"))
+    second = planner.query_table(make_query("a"))
+    assert len(calls) == 1
+    assert second.model_dump() == first.model_dump()
+
+
+def test_only_successful_queries_are_logged(make_planner, make_query):
+    planner = make_planner(window=0)
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError):
+            planner.query_table(make_query("bad"))
+    planner.query_table(make_query("a"))
+    planner.query_table(make_query("a"))  # served from cache, logged again
+
+    assert query_log.hottest(5) == [make_query("a")]
@@ -0,0 +1,87 @@
+"""Tests for prefetching hot queries and the planner-backed simple route."""
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from stat_xplore_mcp import api, prefetch
+from stat_xplore_mcp.backends import QuotaExceededError
+from stat_xplore_mcp.models import CubeData, TableQuery, TableQueryResponse
+from stat_xplore_mcp.querylog import query_hash, query_log, result_cache
+
+
+@pytest.fixture
+def client(monkeypatch, fake_client):
+    monkeypatch.setattr(prefetch, "StatXploreClient", fake_client)
+    return fake_client
+
+
+def test_prefetch_refreshes_and_merges(client, make_query):
+    query_log.record(make_query("a"))
+    query_log.record(make_query("b"))
+
+    assert prefetch.prefetch_hot_queries() == 2
+    assert len(client.calls) == 1
+    assert result_cache.get(make_query("a")) is not None
+
+
+def test_rejected_merge_is_sent_one_query_at_a_time(client, make_query):
+    for _ in range(3):
+        query_log.record(make_query("bad"))
+    query_log.record(make_query("good"))
+
+    assert prefetch.prefetch_hot_queries() == 1
+    assert [c.measures for c in client.calls] == [["bad", "good"], ["bad"], ["good"]]
+    assert result_cache.get(make_query("good")) is not None
+
+
+def test_failed_group_does_not_stop_the_others(client, memory_backend, make_query):
+    garbled = make_query("garbled", recodes={"f": {}})
+    query_log.record(garbled)
+    query_log.record(garbled)
+    query_log.record(make_query("a"))
+
+    assert prefetch.prefetch_hot_queries() == 1
+    assert memory_backend.get(f"prefetch-lock:{query_hash(garbled)}") is None
+    assert result_cache.get(make_query("a")) is not None
+
+
+@pytest.mark.parametrize(
+    "error", [QuotaExceededError("quota"), httpx.ConnectError("down")]
+)
+def test_prefetch_releases_locks_on_failure(client, memory_backend, make_query, error):
+    client.error = error
+    query_log.record(make_query("a"))
+
+    assert prefetch.prefetch_hot_queries() == 0
+    assert memory_backend.get(f"prefetch-lock:{query_hash(make_query('a'))}") is None
+
+    client.error = None
+    assert prefetch.prefetch_hot_queries() == 1
+
+
+def test_simple_table_goes_through_planner(monkeypatch):
+    seen: list[TableQuery] = []
+
+    def query_table(query: TableQuery) -> TableQueryResponse:
+        seen.append(query)
+        return TableQueryResponse(
+            cubes={m: CubeData(values=[1]) for m in query.measures}
+        )
+
+    monkeypatch.setattr(api.planner, "query_table", query_table)
+    with TestClient(api.app) as http:
+        result = http.post(
+            "/table/simple",
+            json={
+                "database": "str:database:HBAI",
+                "measures": ["str:count:HBAI:V_F_HBAI"],
+                "row_fields": ["str:field:HBAI:V_F_HBAI:YEAR"],
+                "filters": {"str:field:HBAI:V_F_HBAI:YEAR": ["v1"]},
+            },
+        )
+
+    assert result.status_code == 200
+    [table_query] = seen
+    assert table_query.dimensions == [["str:field:HBAI:V_F_HBAI:YEAR"]]
+    assert table_query.recodes == {"str:field:HBAI:V_F_HBAI:YEAR": {"map": [["v1"]]}}
@@ -0,0 +1,73 @@
+"""Tests for the decaying, bounded query log."""
+
+from stat_xplore_mcp import querylog
+from stat_xplore_mcp.config import settings
+from stat_xplore_mcp.models import TableQuery
+from stat_xplore_mcp.querylog import QueryLog, query_hash
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+def measures(queries: list[TableQuery]) -> list[str]:
+    return [q.measures[0] for q in queries]
+
+
+def test_recent_hits_outweigh_old_ones(monkeypatch, memory_backend, make_query):
+    clock = Clock(1_000_000.0)
+    monkeypatch.setattr(querylog.time, "time", clock.time)
+    monkeypatch.setattr(settings, "query_log_half_life", 100)
+    log = QueryLog(memory_backend)
+
+    for _ in range(3):
+        log.record(make_query("old"))
+    clock.now += 300  # three half-lives: the old hits now count as 3/8
+    log.record(make_query("new"))
+
+    assert measures(log.hottest(2)) == ["new", "old"]
+
+
+def test_expired_queries_are_pruned(memory_backend, make_query):
+    log = QueryLog(memory_backend)
+    log.record(make_query("gone"))
+    log.record(make_query("gone"))
+    log.record(make_query("kept"))
+    memory_backend.delete(f"querylog:{query_hash(make_query('gone'))}")
+
+    assert measures(log.hottest(2)) == ["kept"]
+    keys = [key for key, _ in memory_backend.top_scores("querylog:scores", 10)]
+    assert keys == [query_hash(make_query("kept"))]
+
+
+def test_score_set_is_bounded(monkeypatch, memory_backend, make_query):
+    monkeypatch.setattr(settings, "query_log_max_entries", 10)
+    log = QueryLog(memory_backend)
+    for i in range(querylog._TRIM_EVERY):
+        log.record(make_query(f"m{i}"))
+
+    assert len(memory_backend.top_scores("querylog:scores", 1000)) == 10
+
+
+def test_new_era_rescales_scores(monkeypatch, memory_backend, make_query):
+    clock = Clock(1_000_000.0)
+    monkeypatch.setattr(querylog.time, "time", clock.time)
+    monkeypatch.setattr(settings, "query_log_half_life", 100)
+    era_length = 100 * querylog._ERA_HALF_LIVES
+    clock.now = era_length * 10 + era_length - 1
+    QueryLog(memory_backend).record(make_query("before"))
+    [(_, before)] = memory_backend.top_scores("querylog:scores", 1)
+
+    clock.now += 1  # a new era begins: the landmark moves forward
+    log = QueryLog(memory_backend)
+    log.hottest(1)
+    [(_, after)] = memory_backend.top_scores("querylog:scores", 1)
+
+    assert before > 2**31
+    assert after == before * 2.0**-querylog._ERA_HALF_LIVES
+    log.record(make_query("after"))
+    assert measures(log.hottest(2)) == ["after", "before"]
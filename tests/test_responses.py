@@ -0,0 +1,88 @@
+"""Tests for precompressed, conditionally cacheable responses."""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from stat_xplore_mcp import responses
+from stat_xplore_mcp.responses import CachedResponse, ResponseMemo
+
+BODY = b'{"items": []}' * 100
+
+
+@pytest.fixture
+def http():
+    cached = CachedResponse(BODY, "application/json", 60)
+    app = FastAPI()
+
+    @app.get("/")
+    def get(request: Request):
+        return cached.respond(request)
+
+    return TestClient(app)
+
+
+def get(http: TestClient, encoding: str, etag: str | None = None):
+    headers = {"Accept-Encoding": encoding}
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    return http.get("/", headers=headers)
+
+
+def test_each_encoding_has_its_own_etag(http):
+    encodings = ["identity", "gzip"]
+    if responses.brotli is not None:
+        encodings.append("br")
+    etags = {get(http, encoding).headers["etag"] for encoding in encodings}
+
+    assert len(etags) == len(encodings)
+
+
+def test_not_modified_only_for_the_same_encoding(http):
+    gzip_etag = get(http, "gzip").headers["etag"]
+
+    assert get(http, "gzip", gzip_etag).status_code == 304
+    assert get(http, "gzip", f"W/{gzip_etag}").status_code == 304
+    assert get(http, "gzip", "*").status_code == 304
+    response = get(http, "identity", gzip_etag)
+    assert response.status_code == 200
+    assert response.content == BODY
+
+
+def test_memo_evicts_least_recently_used():
+    memo = ResponseMemo(ttl=60, max_entries=2)
+    built: list[str] = []
+
+    def build(key: str):
+        def make() -> CachedResponse:
+            built.append(key)
+            return CachedResponse(key.encode(), "text/plain", 60)
+
+        return make
+
+    memo.get("a", build("a"))
+    memo.get("b", build("b"))
+    memo.get("a", build("a"))  # "b" is now least recently used
+    memo.get("c", build("c"))
+    memo.get("a", build("a"))
+    memo.get("b", build("b"))
+
+    assert built == ["a", "b", "c", "b"]
+    assert len(memo) == 2
+
+
+def test_variants_are_compressed_on_first_request():
+    cached = CachedResponse(BODY, "application/json", 60)
+    assert list(cached._variants) == ["identity"]
+
+    assert cached.variant("gzip") is cached.variant("gzip")
+    assert list(cached._variants) == ["identity", "gzip"]
+
+
+@pytest.mark.skipif(responses.brotli is None, reason="brotli is not installed")
+def test_brotli_quality_is_configurable():
+    fast = CachedResponse(BODY, "application/json", 60, brotli_quality=1)
+    best = CachedResponse(BODY, "application/json", 60)
+
+    assert responses.brotli.decompress(fast.variant("br")) == BODY
+    assert len(fast.variant("br")) >= len(best.variant("br"))
@@ -0,0 +1,114 @@
+"""Tests for incremental parsing of table query responses."""
+
+import json
+import tracemalloc
+
+import pytest
+
+from stat_xplore_mcp.models import CubeValues, TableQuery, TableQueryResponse
+from stat_xplore_mcp.querylog import ResultCache
+from stat_xplore_mcp.streaming import parse_table_response
+
+FIELDS = [
+    {
+        "uri": "str:field:HBAI:V_F_HBAI:YEAR",
+        "label": "Year",
+        "items": [{"type": "RecodeItem", "labels": ["2023-24"], "uris": ["y"]}],
+    }
+]
+
+
+def body(cubes: dict, **extra) -> bytes:
+    payload = {
+        "query": {"database": "str:database:HBAI"},
+        "database": {"id": "str:database:HBAI", "label": "HBAI"},
+        "measures": [{"uri": uri, "label": uri} for uri in cubes],
+        "fields": FIELDS,
+        "cubes": cubes,
+        **extra,
+    }
+    return json.dumps(payload).encode()
+
+
+def chunked(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+CASES = {
+    "ints": {"a": {"values": [[1, 2, 3], [4, 5, 6]], "precision": 0}},
+    "floats": {"a": {"values": [[1.5, 2.25], [3.0, 4.125]], "precision": 2}},
+    "none cells": {"a": {"values": [[None, 2], [3, None]], "precision": 0}},
+    "empty": {"a": {"values": [], "precision": 0}},
+    "empty dimension": {"a": {"values": [[], []], "precision": 0}},
+    "three dimensions": {"a": {"values": [[[1], [2]], [[3], [None]]]}},
+    "multiple cubes": {
+        "a": {"values": [1, 2], "precision": 0},
+        "b": {"values": [0.5, None], "precision": 1},
+    },
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+@pytest.mark.parametrize("cubes", CASES.values(), ids=CASES.keys())
+def test_matches_model_validate(cubes, chunk_size):
+    data = body(cubes)
+
+    parsed = parse_table_response(chunked(data, chunk_size))
+    expected = TableQueryResponse.model_validate_json(data)
+
+    assert parsed.model_dump_json() == expected.model_dump_json()
+    assert parsed == expected
+
+
+def test_integers_stay_integers():
+    parsed = parse_table_response([body(CASES["ints"])])
+
+    assert parsed.cubes["a"].values.data.typecode == "q"
+    assert parsed.model_dump()["cubes"]["a"]["values"] == [[1, 2, 3], [4, 5, 6]]
+    assert '"values":[[1,2,3],[4,5,6]]' in parsed.model_dump_json()
+
+
+@pytest.mark.parametrize(
+    "values",
+    [[[], [1, 2]], [[1, 2], [3]], [[1], [[2]]], [1, []], [[1], 2], 5, [{"x": 1}]],
+)
+def test_ragged_values_are_rejected(values):
+    with pytest.raises(ValueError):
+        parse_table_response([body({"a": {"values": values}})])
+
+
+def test_cache_keeps_typed_buffers():
+    cache = ResultCache()
+    query = TableQuery(database="d", measures=["a", "b"], dimensions=[["f"]])
+    parsed = parse_table_response([body(CASES["multiple cubes"])])
+
+    cache.set(query, parsed)
+    cached = cache.get(query)
+
+    assert isinstance(cached.cubes["a"].values, CubeValues)
+    assert cached.model_dump_json() == parsed.model_dump_json()
+
+
+def test_cube_memory_is_compact():
+    rows, columns = 200, 500
+    values = [[r * 100_000 + c for c in range(columns)] for r in range(rows)]
+    data = body({"a": {"values": values, "precision": 0}})
+    del values
+
+    def retained(parse) -> int:
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            response = parse()
+            return tracemalloc.get_traced_memory()[0] - before
+        finally:
+            del response
+            tracemalloc.stop()
+
+    streamed = retained(lambda: parse_table_response(chunked(data, 1 << 16)))
+    validated = retained(lambda: TableQueryResponse.model_validate_json(data))
+
+    # 8 bytes per cell plus array over-allocation, against a pointer and an
+    # int object per cell
+    assert streamed < rows * columns * 10
+    assert streamed * 3 < validated